@@ -3,15 +3,23 @@ import pickle
 import traceback
 import glob
 import os
+import time
+import zlib
 import numpy as np
 import modules.common as c
 import modules.memory as m
 import modules.queue as q
 import modules.organism as o
+import modules.recorder as r
+import modules.overview as v
+import modules.control as n
+import modules.island as i
+import modules.export as e
 
 
 class Fungera:
-    def __init__(self):
+    def __init__(self, line_args, island=None):
+        c.setup(line_args)
         self.timer = c.RepeatedTimer(
             c.config['autosave_rate'], self.save_state, (True,)
         )
@@ -19,41 +27,115 @@ class Fungera:
         if not os.path.exists('snapshots'):
             os.makedirs('snapshots')
         self.cycle = 0
-        self.is_minimal = False
+        self.is_headless = c.screen is None
+        self.is_minimal = self.is_headless
+        m.memory = m.Memory() if self.is_headless else m.MemoryFull()
+        q.queue = q.Queue(
+            '{}:{}'.format(c.config['random_seed'], c.config['simulation_name'])
+        )
+        self.last_status = (time.time(), self.cycle)
         self.purges = 0
-        self.info_window = c.screen.derived(
-            np.array([0, 0]), c.config['info_display_size'],
+        self.reaped = 0
+        self.is_replaying = False
+        self.recorder = None
+        if c.config['record'] or c.config['seek'] is not None:
+            self.recorder = r.Recorder(c.recording_directory())
+        self.overview = None
+        if c.config['overview_rate']:
+            self.overview = v.Overview(
+                os.path.join('overviews', self.simulation_slug()),
+                c.config['overview_size'],
+            )
+        self.control = None
+        if c.config['control_port']:
+            try:
+                self.control = n.ControlServer(c.config['control_port'])
+            except OSError as error:
+                self.stop()
+                c.parser.error(
+                    'cannot open control port {}: {}'.format(
+                        c.config['control_port'], error.strerror
+                    )
+                )
+        self.island = island
+        if self.island is None and c.config['island_port']:
+            self.island = i.ConnectionTransport(
+                (c.config['island_host'], c.config['island_port']),
+                [i.parse_address(peer) for peer in c.config['island_peers']],
+                c.config['island_key'].encode(),
+                int(np.prod(c.config['memory_size'])),
+                c.config['migration_timeout'],
+            )
+        self.migration_random = np.random.RandomState(
+            [
+                c.config['random_seed'],
+                zlib.crc32(c.config['simulation_name'].encode()),
+                c.config['island_port'] or 0,
+            ]
         )
+        self.info_window = None
+        if not self.is_headless:
+            self.info_window = c.screen.derived(
+                np.array([0, 0]), c.config['info_display_size'],
+            )
         genome_size = self.load_genome_into_memory(
             'initial.gen', c.config['memory_size'] // 2
         )
-        o.OrganismFull(c.config['memory_size'] // 2, genome_size)
+        self.organism_class()(c.config['memory_size'] // 2, genome_size)
         self.update_info()
-        if c.config['snapshot_to_load'] != 'new':
+        if c.config['seek'] is not None:
+            self.seek(c.config['seek'])
+            if not c.config['record']:
+                self.recorder = None
+        elif c.config['snapshot_to_load'] != 'new':
             self.load_state()
+        if self.recorder is not None:
+            self.restart_recording()
 
     def run(self):
         try:
-            self.input_stream()
+            if self.is_headless:
+                self.headless_stream()
+            else:
+                self.input_stream()
         except KeyboardInterrupt:
-            curses.endwin()
-            self.timer.cancel()
+            self.stop()
         except Exception:
-            curses.endwin()
-            self.timer.cancel()
+            self.stop()
             print(traceback.format_exc())
 
+    def stop(self):
+        if not self.is_headless:
+            curses.endwin()
+        self.timer.cancel()
+
     def load_genome_into_memory(self, filename: str, address: np.array) -> np.array:
         with open(filename) as genome_file:
             genome = np.array([list(line.strip()) for line in genome_file])
         m.memory.load_genome(genome, address, genome.shape)
         return genome.shape
 
+    def organism_class(self):
+        return o.Organism if self.is_minimal else o.OrganismFull
+
     def update_position(self, delta):
         m.memory.scroll(delta)
         q.queue.update_all()
         self.update_info()
 
+    def select_at_cursor(self):
+        try:
+            _, x, y, _, _ = curses.getmouse()
+        except curses.error:
+            return
+        x -= c.config['info_display_size'][1]
+        address = m.memory.position + np.array([y, x])
+        if (address >= m.memory.position).all() and (
+            address < m.memory.position + m.memory.size
+        ).all():
+            q.queue.select_at(address)
+            self.update_info()
+
     def update_info_full(self):
         self.info_window.erase()
         info = ''
@@ -61,12 +143,17 @@ class Fungera:
         info += 'Cycle      : {}\n'.format(self.cycle)
         info += 'Position   : {}\n'.format(list(m.memory.position))
         info += 'Total      : {}\n'.format(len(q.queue.organisms))
-        info += 'Purges     : {}\n'.format(self.purges)
+        if c.config['incremental_reaper']:
+            info += 'Reaped     : {}\n'.format(self.reaped)
+        else:
+            info += 'Purges     : {}\n'.format(self.purges)
         info += 'Organism   : {}\n'.format(q.queue.index)
         info += q.queue.get_organism().info()
         self.info_window.print(info)
 
     def update_info_minimal(self):
+        if self.is_headless:
+            return
         self.info_window.erase()
         info = ''
         info += 'Minimal mode '
@@ -76,6 +163,8 @@ class Fungera:
         self.info_window.print(info)
 
     def update_info(self):
+        if self.is_headless:
+            return
         if not self.is_minimal:
             self.update_info_full()
         else:
@@ -91,73 +180,274 @@ class Fungera:
         q.queue.toogle_minimal()
 
     def save_state(self, from_timer=False):
+        if not self.is_minimal and from_timer:
+            return
+        filename = 'snapshots/{}_cycle_{}.snapshot'.format(
+            self.simulation_slug(), self.cycle
+        )
+        self.dump_state(filename)
+
+    def load_state(self):
+        try:
+            if (
+                c.config['snapshot_to_load'] == 'last'
+                or c.config['snapshot_to_load'] == 'new'
+            ):
+                filename = max(glob.glob('snapshots/*'), key=os.path.getctime)
+            else:
+                filename = c.config['snapshot_to_load']
+            self.read_state(filename)
+        except Exception:
+            pass
+
+    def dump_state(self, filename: str):
         return_to_full = False
         if not self.is_minimal:
-            if from_timer:
-                return
             self.toogle_minimal()
             return_to_full = True
-        filename = 'snapshots/{}_cycle_{}.snapshot'.format(
-            c.config['simulation_name'].lower().replace(' ', '_'), self.cycle
-        )
         with open(filename, 'wb') as f:
             state = {
                 'cycle': self.cycle,
+                'purges': self.purges,
+                'reaped': self.reaped,
                 'memory': m.memory,
                 'queue': q.queue,
+                'random_state': np.random.get_state(),
             }
             pickle.dump(state, f)
-        if not self.is_minimal or return_to_full:
+        if return_to_full:
             self.toogle_minimal()
 
-    def load_state(self):
+    def read_state(self, filename: str):
+        with open(filename, 'rb') as f:
+            state = pickle.load(f)
         return_to_full = False
         if not self.is_minimal:
             self.toogle_minimal()
             return_to_full = True
-        try:
-            if (
-                c.config['snapshot_to_load'] == 'last'
-                or c.config['snapshot_to_load'] == 'new'
-            ):
-                filename = max(glob.glob('snapshots/*'), key=os.path.getctime)
-            else:
-                filename = c.config['snapshot_to_load']
-            with open(filename, 'rb') as f:
-                state = pickle.load(f)
-                memory = state['memory']
-                q.queue = state['queue']
-                self.cycle = state['cycle']
-        except Exception:
-            pass
-        if not self.is_minimal or return_to_full:
+        memory = state['memory']
+        q.queue = state['queue']
+        if memory.ownership_map is None:
+            memory.restore_ownership(q.queue.organisms)
+        self.cycle = state['cycle']
+        self.purges = state.get('purges', self.purges)
+        self.reaped = state.get('reaped', self.reaped)
+        if 'random_state' in state:
+            np.random.set_state(state['random_state'])
+        if return_to_full:
             self.toogle_minimal(memory)
         else:
             m.memory = memory
             self.update_info_minimal()
 
+    def simulation_slug(self) -> str:
+        return c.simulation_slug()
+
+    def export_population(self):
+        filename = 'exports/{}_cycle_{}.npz'.format(self.simulation_slug(), self.cycle)
+        e.export_population(
+            filename,
+            m.memory.memory_map,
+            q.queue.organisms,
+            c.config['export_children'],
+        )
+        return filename
+
+    def restart_recording(self):
+        self.recorder.rewind(self.cycle)
+        self.checkpoint()
+
+    def checkpoint(self):
+        self.dump_state(self.recorder.checkpoint_filename(self.cycle))
+
+    def record(self, command: str):
+        if self.recorder is not None and not self.is_replaying:
+            self.recorder.record(self.cycle, command)
+        self.execute(command)
+
+    def execute(self, command: str):
+        if command == 'kill':
+            q.queue.kill_organisms()
+            if not self.is_minimal:
+                m.memory.update(refresh=True)
+                q.queue.update_all()
+        elif command.startswith('immigrate:'):
+            _, address, size, genome = command.split(':', 3)
+            address = np.array([int(value) for value in address.split(',')])
+            size = np.array([int(value) for value in size.split(',')])
+            m.memory.load_genome(np.array(list(genome)).reshape(size), address, size)
+            self.organism_class()(address, size)
+
+    def set_running(self, is_running: bool):
+        c.is_running = is_running
+        if self.is_minimal:
+            self.update_info_minimal()
+
+    def step(self):
+        if not c.is_running:
+            q.queue.cycle_all()
+            self.make_cycle()
+
+    def load(self):
+        self.load_state()
+        if self.recorder is not None:
+            self.restart_recording()
+
+    def status(self) -> dict:
+        now = time.time()
+        throughput = (self.cycle - self.last_status[1]) / max(
+            now - self.last_status[0], 1e-9
+        )
+        self.last_status = (now, self.cycle)
+        errors = [organism.errors for organism in q.queue.organisms]
+        return {
+            'simulation': c.config['simulation_name'],
+            'cycle': self.cycle,
+            'running': c.is_running,
+            'throughput': throughput,
+            'organisms': len(q.queue.organisms),
+            'purges': self.purges,
+            'reaped': self.reaped,
+            'memory': int(m.memory.allocated) / m.memory.allocation_map.size,
+            'errors_mean': float(np.mean(errors)) if errors else 0.0,
+            'errors_max': int(max(errors)) if errors else 0,
+            'children': int(sum(organism.children for organism in q.queue.organisms)),
+        }
+
+    def command(self, command: str) -> dict:
+        if command == 'status':
+            return self.status()
+        if command == 'info':
+            return {'organism': q.queue.index, 'info': q.queue.get_organism().info()}
+        if command == 'pause':
+            self.set_running(False)
+        elif command == 'resume':
+            self.set_running(True)
+        elif command == 'step':
+            self.step()
+        elif command == 'save':
+            self.save_state()
+        elif command == 'load':
+            self.load()
+        elif command == 'kill':
+            self.record('kill')
+        elif command == 'export':
+            return {'export': self.export_population()}
+        else:
+            return {'error': 'Unknown command: {}'.format(command)}
+        return self.status()
+
+    def emigrants(self) -> list:
+        organisms = q.queue.organisms
+        count = min(c.config['migration_size'], len(organisms))
+        genomes = []
+        for index in self.migration_random.choice(len(organisms), count, False):
+            organism = organisms[index]
+            genomes.append(
+                np.copy(
+                    m.memory.memory_map[
+                        organism.start[0] : organism.start[0] + organism.size[0],
+                        organism.start[1] : organism.start[1] + organism.size[1],
+                    ]
+                )
+            )
+        return genomes
+
+    def immigrate(self, genome: np.array):
+        if not i.is_valid_genome(genome, c.config['memory_size']):
+            return
+        size = np.array(genome.shape)
+        for _ in range(c.config['migration_attempts']):
+            address = np.array(
+                [
+                    self.migration_random.randint(length, memory_length - length)
+                    for length, memory_length in zip(size, c.config['memory_size'])
+                ]
+            )
+            if m.memory.is_allocated_region(address, size) is False:
+                self.record(
+                    'immigrate:{},{}:{},{}:{}'.format(
+                        *address, *size, ''.join(genome.flat)
+                    )
+                )
+                return
+
+    def migrate(self):
+        self.island.send(self.emigrants())
+        for genome in self.island.receive():
+            self.immigrate(genome)
+
+    def headless_stream(self):
+        c.is_running = True
+        while True:
+            if self.control is not None and self.control.requests:
+                self.control.serve_requests(self.command)
+            if c.is_running:
+                q.queue.cycle_all()
+                self.make_cycle()
+            else:
+                time.sleep(0.05)
+
+    def seek(self, cycle: int):
+        filename = self.recorder.nearest_checkpoint(cycle)
+        if filename is None:
+            c.parser.error('no checkpoint at or before cycle {}'.format(cycle))
+        return_to_full = False
+        if not self.is_minimal:
+            self.toogle_minimal()
+            return_to_full = True
+        self.read_state(filename)
+        self.is_replaying = True
+        while self.cycle < cycle:
+            for command in self.recorder.events_at(self.cycle):
+                self.execute(command)
+            q.queue.cycle_all()
+            self.make_cycle()
+        self.is_replaying = False
+        if return_to_full:
+            self.toogle_minimal()
+        else:
+            self.update_info_minimal()
+
     def make_cycle(self):
         if self.cycle % c.config['random_rate'] == 0:
             m.memory.cycle()
-        if self.cycle % c.config['cycle_gap'] == 0:
+        if c.config['incremental_reaper']:
+            self.reaped += q.queue.reap()
+        elif self.cycle % c.config['cycle_gap'] == 0:
             if m.memory.is_time_to_kill():
                 q.queue.kill_organisms()
                 self.purges += 1
+                if not self.is_minimal:
+                    m.memory.update(refresh=True)
         if not self.is_minimal:
             q.queue.update_all()
+        if self.overview is not None and self.cycle % c.config['overview_rate'] == 0:
+            self.overview.save(self.cycle)
         self.cycle += 1
         self.update_info()
+        if (
+            self.recorder is not None
+            and not self.is_replaying
+            and self.cycle % c.config['checkpoint_rate'] == 0
+        ):
+            self.checkpoint()
+        if (
+            self.island is not None
+            and not self.is_replaying
+            and self.cycle % c.config['migration_rate'] == 0
+        ):
+            self.migrate()
 
     def input_stream(self):
         while True:
+            if self.control is not None and self.control.requests:
+                self.control.serve_requests(self.command)
             key = c.screen.get_key()
             if key == ord(' '):
-                c.is_running = not c.is_running
-                if self.is_minimal:
-                    self.update_info_minimal()
+                self.set_running(not c.is_running)
             elif key == ord('c') and not c.is_running:
-                q.queue.cycle_all()
-                self.make_cycle()
+                self.step()
             elif key == curses.KEY_DOWN and not self.is_minimal:
                 self.update_position(c.config['scroll_step'] * c.deltas['down'])
             elif key == curses.KEY_UP and not self.is_minimal:
@@ -172,18 +462,22 @@ class Fungera:
             elif key == ord('a') and not self.is_minimal:
                 q.queue.select_previous()
                 self.update_info()
+            elif key == curses.KEY_MOUSE and not self.is_minimal:
+                self.select_at_cursor()
             elif key == ord('m'):
                 self.toogle_minimal()
             elif key == ord('p'):
                 self.save_state()
             elif key == ord('l'):
-                self.load_state()
+                self.load()
             elif key == ord('k'):
-                q.queue.kill_organisms()
+                self.record('kill')
+            elif key == ord('e'):
+                self.export_population()
             elif key == -1 and c.is_running:
                 q.queue.cycle_all()
                 self.make_cycle()
 
 
 if __name__ == '__main__':
-    Fungera().run()
+    Fungera(c.parser.parse_args()).run()
@@ -0,0 +1,218 @@
+import operator
+import numpy as np
+
+
+class ChunkedArray:
+    def __init__(self, shape, chunk_size: int, fill, dtype):
+        self.shape = tuple(int(size) for size in shape)
+        self.size = self.shape[0] * self.shape[1]
+        self.chunk_size = int(chunk_size)
+        self.dtype = np.dtype(dtype)
+        self.fill = self.dtype.type(fill)
+        self.chunks = {}
+        self.cells = {}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'cells' not in state:
+            self.cells = {}
+
+    def normalize(self, index, axis: int) -> int:
+        index = operator.index(index)
+        if index < -self.shape[axis] or index >= self.shape[axis]:
+            raise IndexError(
+                'index {} is out of bounds for axis {} with size {}'.format(
+                    index, axis, self.shape[axis]
+                )
+            )
+        return index % self.shape[axis]
+
+    def bounds(self, key) -> list:
+        bounds = []
+        for axis, index in enumerate(key):
+            if isinstance(index, slice):
+                start, stop, step = index.indices(self.shape[axis])
+                if step != 1:
+                    raise IndexError('only contiguous slices are supported')
+                bounds.append((start, max(start, stop)))
+            else:
+                index = self.normalize(index, axis)
+                bounds.append((index, index + 1))
+        return bounds
+
+    def chunk_bounds(self, bounds: list):
+        (row_start, row_stop), (col_start, col_stop) = bounds
+        for chunk_row in range(
+            row_start // self.chunk_size, -(-row_stop // self.chunk_size)
+        ):
+            for chunk_col in range(
+                col_start // self.chunk_size, -(-col_stop // self.chunk_size)
+            ):
+                origin = np.array([chunk_row, chunk_col]) * self.chunk_size
+                start = np.maximum(origin, (row_start, col_start))
+                stop = np.minimum(origin + self.chunk_size, (row_stop, col_stop))
+                yield (chunk_row, chunk_col), origin, start, stop
+
+    def new_chunk(self, chunk_index: tuple) -> np.array:
+        shape = np.minimum(
+            self.chunk_size,
+            np.array(self.shape) - np.array(chunk_index) * self.chunk_size,
+        )
+        chunk = np.full(shape, self.fill, dtype=self.dtype)
+        for (row, col), value in self.cells.pop(chunk_index, {}).items():
+            chunk[row % self.chunk_size, col % self.chunk_size] = value
+        self.chunks[chunk_index] = chunk
+        return chunk
+
+    def chunk_cells(self, chunk_index: tuple, start, stop):
+        for (row, col), value in self.cells.get(chunk_index, {}).items():
+            if start[0] <= row < stop[0] and start[1] <= col < stop[1]:
+                yield row, col, value
+
+    def put_cell(self, row, col, value):
+        row, col = self.normalize(row, 0), self.normalize(col, 1)
+        chunk_index = (row // self.chunk_size, col // self.chunk_size)
+        chunk = self.chunks.get(chunk_index)
+        if chunk is not None:
+            chunk[row % self.chunk_size, col % self.chunk_size] = value
+            return
+        cells = self.cells.setdefault(chunk_index, {})
+        if value == self.fill:
+            cells.pop((row, col), None)
+        else:
+            cells[(row, col)] = self.dtype.type(value)
+        if not cells:
+            del self.cells[chunk_index]
+        elif len(cells) > self.chunk_size**2 // 64:
+            self.new_chunk(chunk_index)
+
+    def __getitem__(self, key):
+        row, col = key
+        if not isinstance(row, slice) and not isinstance(col, slice):
+            row, col = self.normalize(row, 0), self.normalize(col, 1)
+            chunk_index = (row // self.chunk_size, col // self.chunk_size)
+            chunk = self.chunks.get(chunk_index)
+            if chunk is None:
+                cells = self.cells.get(chunk_index)
+                return cells.get((row, col), self.fill) if cells else self.fill
+            return chunk[row % self.chunk_size, col % self.chunk_size]
+        bounds = self.bounds(key)
+        offset = np.array([bounds[0][0], bounds[1][0]])
+        result = np.full(
+            (bounds[0][1] - bounds[0][0], bounds[1][1] - bounds[1][0]),
+            self.fill,
+            dtype=self.dtype,
+        )
+        for chunk_index, origin, start, stop in self.chunk_bounds(bounds):
+            chunk = self.chunks.get(chunk_index)
+            if chunk is not None:
+                result[
+                    start[0] - offset[0] : stop[0] - offset[0],
+                    start[1] - offset[1] : stop[1] - offset[1],
+                ] = chunk[
+                    start[0] - origin[0] : stop[0] - origin[0],
+                    start[1] - origin[1] : stop[1] - origin[1],
+                ]
+            else:
+                for cell_row, cell_col, value in self.chunk_cells(
+                    chunk_index, start, stop
+                ):
+                    result[cell_row - offset[0], cell_col - offset[1]] = value
+        if not isinstance(row, slice):
+            result = result[0]
+        elif not isinstance(col, slice):
+            result = result[:, 0]
+        return result
+
+    def __setitem__(self, key, value):
+        row, col = key
+        if not isinstance(row, slice) and not isinstance(col, slice):
+            row, col = self.normalize(row, 0), self.normalize(col, 1)
+            chunk_index = (row // self.chunk_size, col // self.chunk_size)
+            chunk = self.chunks.get(chunk_index)
+            if chunk is None:
+                if value == self.fill:
+                    self.put_cell(row, col, value)
+                    return
+                chunk = self.new_chunk(chunk_index)
+            chunk[row % self.chunk_size, col % self.chunk_size] = value
+            return
+        bounds = self.bounds(key)
+        offset = np.array([bounds[0][0], bounds[1][0]])
+        shape = (bounds[0][1] - bounds[0][0], bounds[1][1] - bounds[1][0])
+        value = np.asarray(value, dtype=self.dtype)
+        if value.ndim:
+            value = np.broadcast_to(value, shape)
+        for chunk_index, origin, start, stop in self.chunk_bounds(bounds):
+            part = (
+                value[
+                    start[0] - offset[0] : stop[0] - offset[0],
+                    start[1] - offset[1] : stop[1] - offset[1],
+                ]
+                if value.ndim
+                else value
+            )
+            chunk = self.chunks.get(chunk_index)
+            if chunk is None:
+                if (part == self.fill).all():
+                    for cell_row, cell_col, _ in list(
+                        self.chunk_cells(chunk_index, start, stop)
+                    ):
+                        self.put_cell(cell_row, cell_col, self.fill)
+                    continue
+                chunk = self.new_chunk(chunk_index)
+            chunk[
+                start[0] - origin[0] : stop[0] - origin[0],
+                start[1] - origin[1] : stop[1] - origin[1],
+            ] = part
+
+    def take(self, rows: np.array, cols: np.array) -> np.array:
+        result = np.full(len(rows), self.fill, dtype=self.dtype)
+        chunk_rows = rows // self.chunk_size
+        chunk_cols = cols // self.chunk_size
+        keys = chunk_rows * (self.shape[1] // self.chunk_size + 1) + chunk_cols
+        order = np.argsort(keys, kind='stable')
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        for group in np.split(order, bounds):
+            if not len(group):
+                continue
+            chunk_index = (int(chunk_rows[group[0]]), int(chunk_cols[group[0]]))
+            chunk = self.chunks.get(chunk_index)
+            if chunk is not None:
+                result[group] = chunk[
+                    rows[group] % self.chunk_size, cols[group] % self.chunk_size
+                ]
+            elif chunk_index in self.cells:
+                cells = self.cells[chunk_index]
+                keys = np.array([row * self.shape[1] + col for row, col in cells])
+                values = np.array(list(cells.values()), dtype=self.dtype)
+                order = np.argsort(keys)
+                keys, values = keys[order], values[order]
+                flat = rows[group] * self.shape[1] + cols[group]
+                found = np.minimum(np.searchsorted(keys, flat), len(keys) - 1)
+                hits = keys[found] == flat
+                result[group[hits]] = values[found[hits]]
+        return result
+
+    def count_nonzero(self) -> int:
+        count = sum(np.count_nonzero(chunk) for chunk in self.chunks.values())
+        if self.fill:
+            count += self.size - sum(chunk.size for chunk in self.chunks.values())
+        for row, col, value in self.cell_items():
+            count += bool(value) - bool(self.fill)
+        return count
+
+    def chunk_items(self):
+        for chunk_index, chunk in self.chunks.items():
+            yield np.array(chunk_index) * self.chunk_size, chunk
+
+    def cell_items(self):
+        for cells in self.cells.values():
+            for (row, col), value in cells.items():
+                yield row, col, value
+
+
+def count_nonzero(array) -> int:
+    if isinstance(array, ChunkedArray):
+        return array.count_nonzero()
+    return np.count_nonzero(array)
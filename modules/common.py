@@ -1,9 +1,12 @@
 import curses
+import glob
 import os
 import argparse
+from typing import Optional
 from threading import Thread, Event
 import toml
 import numpy as np
+import modules.recorder as r
 import modules.window as w
 
 
@@ -91,6 +94,7 @@ def init_curses():
     curses.noecho()
     curses.cbreak()
     curses.curs_set(0)
+    curses.mousemask(curses.BUTTON1_CLICKED)
 
     curses.start_color()
     curses.use_default_colors()
@@ -103,16 +107,68 @@ def init_curses():
     return _screen
 
 
-def load_config():
-    _config = {}
+def load_config(line_args: Optional[argparse.Namespace] = None) -> dict:
+    if line_args is None:
+        line_args = parser.parse_args([])
+    config.clear()
     for key, value in toml.load('config.toml').items():
-        _config[key] = np.array(value) if isinstance(value, list) else value
-    _config['simulation_name'] = line_args.name
-    _config['snapshot_to_load'] = line_args.state
-    return _config
+        config[key] = np.array(value) if isinstance(value, list) else value
+    config['simulation_name'] = line_args.name
+    config['snapshot_to_load'] = line_args.state
+    config['record'] = line_args.record
+    config['seek'] = line_args.seek
+    config['island_host'] = line_args.island_host
+    config['island_port'] = line_args.island_port
+    config['island_peers'] = line_args.island_peer
+    if line_args.control_port is not None:
+        config['control_port'] = line_args.control_port
+    return config
+
+
+def simulation_slug() -> str:
+    return config['simulation_name'].lower().replace(' ', '_')
+
+
+def recording_directory() -> str:
+    return os.path.join('checkpoints', simulation_slug())
+
+
+def setup(line_args: argparse.Namespace):
+    global screen
+    load_config(line_args)
+    if (
+        config['record']
+        and config['seek'] is None
+        and config['snapshot_to_load'] == 'new'
+        and glob.glob(os.path.join(recording_directory(), '*'))
+    ):
+        parser.error(
+            'simulation "{}" is already recorded, '
+            'use --seek to continue it or choose another --name'.format(
+                config['simulation_name']
+            )
+        )
+    if config['seek'] is not None:
+        recorder = r.Recorder(recording_directory())
+        if recorder.nearest_checkpoint(config['seek']) is None:
+            parser.error(
+                'simulation "{}" has no checkpoint at or before cycle {}'.format(
+                    config['simulation_name'], config['seek']
+                )
+            )
+    if config['island_port'] and not config.get('island_key'):
+        parser.error('island mode requires island_key in config.toml')
+    screen = None
+    if not line_args.headless:
+        try:
+            screen = init_curses()
+        except Exception:
+            print('No display found')
 
 
 is_running = False
+config = {}
+screen = None
 
 parser = argparse.ArgumentParser(
     description='Fungera - two-dimentional artificial life simulator'
@@ -121,13 +177,31 @@ parser.add_argument('--name', default='Simulation 1', help='Simulation name')
 parser.add_argument(
     '--state', default='new', help='State file to load (new/last/filename)'
 )
-
-line_args = parser.parse_args()
-
-try:
-    screen = init_curses()
-except Exception:
-    print('No display found')
-    screen = None
-
-config = load_config()
+parser.add_argument(
+    '--record',
+    action='store_true',
+    help='Record checkpoints and user commands for deterministic replay',
+)
+parser.add_argument(
+    '--seek', type=int, default=None, help='Replay recorded simulation up to cycle'
+)
+parser.add_argument(
+    '--headless', action='store_true', help='Run without the terminal interface'
+)
+parser.add_argument(
+    '--control-port', type=int, default=None, help='Local control endpoint port'
+)
+parser.add_argument(
+    '--island-host',
+    default='127.0.0.1',
+    help='Interface to receive migrants on (default: localhost only)',
+)
+parser.add_argument(
+    '--island-port', type=int, default=None, help='Port to receive migrants on'
+)
+parser.add_argument(
+    '--island-peer',
+    action='append',
+    default=[],
+    help='Island to send migrants to (host:port), may be repeated',
+)
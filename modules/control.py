@@ -0,0 +1,47 @@
+import asyncio
+import json
+import socket
+from collections import deque
+from concurrent.futures import Future
+from threading import Thread
+
+
+class ControlServer(Thread):
+    def __init__(self, port: int, host: str = '127.0.0.1'):
+        Thread.__init__(self, daemon=True)
+        self.host = host
+        self.port = port
+        self.socket = socket.create_server((host, port))
+        self.requests = deque()
+        self.start()
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle, sock=self.socket)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip()
+            if not command:
+                continue
+            future = Future()
+            self.requests.append((command, future))
+            response = await asyncio.wrap_future(future)
+            writer.write((json.dumps(response) + '\n').encode())
+            await writer.drain()
+        writer.close()
+
+    def serve_requests(self, execute):
+        while self.requests:
+            command, future = self.requests.popleft()
+            try:
+                future.set_result(execute(command))
+            except Exception as error:
+                future.set_result({'error': str(error)})
@@ -0,0 +1,99 @@
+import argparse
+import os
+import pickle
+import numpy as np
+import modules.chunked as ch
+
+
+def region_cells(starts: np.array, sizes: np.array, shape: tuple) -> tuple:
+    starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+    stops = np.minimum(starts + np.asarray(sizes).reshape(-1, 2), shape)
+    sizes = np.maximum(stops - starts, 0)
+    sizes[(sizes == 0).any(axis=1)] = 0
+    row_offsets = np.concatenate(([0], np.cumsum(sizes[:, 0])))
+    row_owners = np.repeat(np.arange(len(sizes)), sizes[:, 0])
+    row_starts = (
+        starts[row_owners, 0] + np.arange(row_offsets[-1]) - row_offsets[row_owners]
+    ) * shape[1] + starts[row_owners, 1]
+    widths = sizes[row_owners, 1]
+    cell_offsets = np.concatenate(([0], np.cumsum(widths)))
+    cells = np.arange(cell_offsets[-1]) + np.repeat(
+        row_starts - cell_offsets[:-1], widths
+    )
+    return cells, cell_offsets[row_offsets], sizes
+
+
+def gather(memory_map, starts: np.array, sizes: np.array) -> tuple:
+    cells, offsets, sizes = region_cells(starts, sizes, memory_map.shape)
+    if isinstance(memory_map, ch.ChunkedArray):
+        cells = memory_map.take(*np.divmod(cells, memory_map.shape[1]))
+    else:
+        cells = np.ravel(memory_map).take(cells)
+    return cells.view(np.uint32).astype(np.uint8), offsets, sizes
+
+
+def unpack(genomes: np.array, offsets: np.array, sizes: np.array, index: int):
+    genome = genomes[offsets[index] : offsets[index + 1]].view('S1').astype('U1')
+    return genome.reshape(sizes[index])
+
+
+def export_population(
+    filename: str, memory_map, organisms: list, children: bool = False
+):
+    directory = os.path.dirname(filename)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    starts = np.array([organism.start for organism in organisms], dtype=np.int64)
+    sizes = np.array([organism.size for organism in organisms], dtype=np.int64)
+    genomes, offsets, sizes = gather(memory_map, starts, sizes)
+    dataset = {
+        'genomes': genomes,
+        'offsets': offsets,
+        'sizes': sizes,
+        'organism_id': np.array(
+            [str(organism.organism_id) for organism in organisms], dtype='U36'
+        ),
+        'parent': np.array(
+            [
+                '' if organism.parent is None else str(organism.parent)
+                for organism in organisms
+            ],
+            dtype='U36',
+        ),
+        'errors': np.array([organism.errors for organism in organisms], np.int64),
+        'children': np.array([organism.children for organism in organisms], np.int64),
+    }
+    if children:
+        child_starts = np.array(
+            [organism.child_start for organism in organisms], dtype=np.int64
+        )
+        child_sizes = np.array(
+            [organism.child_size for organism in organisms], dtype=np.int64
+        )
+        (
+            dataset['child_genomes'],
+            dataset['child_offsets'],
+            dataset['child_sizes'],
+        ) = gather(memory_map, child_starts, child_sizes)
+    np.savez_compressed(filename, **dataset)
+
+
+def export_snapshot(snapshot: str, filename: str, children: bool = False):
+    with open(snapshot, 'rb') as f:
+        state = pickle.load(f)
+    export_population(
+        filename, state['memory'].memory_map, state['queue'].organisms, children
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Export genomes of all living organisms from a snapshot'
+    )
+    parser.add_argument('snapshot', type=str, help='Snapshot to read')
+    parser.add_argument('output', type=str, help='Compressed .npz dataset to write')
+    parser.add_argument(
+        '--children', action='store_true', help='Also export child blocks'
+    )
+    line_args = parser.parse_args()
+    export_snapshot(line_args.snapshot, line_args.output, line_args.children)
@@ -0,0 +1,148 @@
+import asyncio
+import hmac
+import os
+import struct
+from collections import deque
+from threading import Thread
+import numpy as np
+import modules.common as c
+
+header = struct.Struct('!II')
+challenge_size = 32
+
+
+def encode_genome(genome: np.array) -> bytes:
+    return (
+        header.pack(*genome.shape) + genome.view(np.uint32).astype(np.uint8).tobytes()
+    )
+
+
+def decode_genome(data: bytes) -> np.array:
+    rows, cols = header.unpack(data[: header.size])
+    genome = np.frombuffer(data[header.size :], dtype='S1')
+    if genome.size != rows * cols:
+        raise ValueError('genome size does not match its header')
+    return genome.astype('U1').reshape(rows, cols)
+
+
+def is_valid_genome(genome, memory_size: np.array) -> bool:
+    return (
+        isinstance(genome, np.ndarray)
+        and genome.ndim == 2
+        and genome.dtype == np.dtype('U1')
+        and (np.array(genome.shape) > 0).all()
+        and (2 * np.array(genome.shape) < memory_size).all()
+        and np.isin(genome, list(c.instructions)).all()
+    )
+
+
+def digest(authkey: bytes, challenge: bytes) -> bytes:
+    return hmac.new(authkey, challenge, 'sha256').digest()
+
+
+class Transport:
+    def __init__(self):
+        self.inbox = deque()
+
+    def receive(self) -> list:
+        genomes = []
+        while self.inbox:
+            genomes.append(self.inbox.popleft())
+        return genomes
+
+
+class LoopbackTransport(Transport):
+    def __init__(self):
+        super(LoopbackTransport, self).__init__()
+        self.peers = []
+
+    def connect(self, peer: Transport):
+        self.peers.append(peer)
+
+    def send(self, genomes: list):
+        for peer in self.peers:
+            peer.inbox.extend(np.copy(genome) for genome in genomes)
+
+
+class ConnectionTransport(Transport, Thread):
+    def __init__(
+        self,
+        address: tuple,
+        peers: list,
+        authkey: bytes,
+        max_size: int,
+        timeout: float,
+    ):
+        Transport.__init__(self)
+        Thread.__init__(self, daemon=True)
+        self.address = address
+        self.peers = peers
+        self.authkey = authkey
+        self.max_size = max_size
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.start()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.serve())
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle, *self.address)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        try:
+            await asyncio.wait_for(self.accept(reader, writer), self.timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def accept(self, reader, writer):
+        challenge = os.urandom(challenge_size)
+        writer.write(challenge)
+        await writer.drain()
+        response = await reader.readexactly(challenge_size)
+        if not hmac.compare_digest(response, digest(self.authkey, challenge)):
+            return
+        while True:
+            data = await reader.read(header.size)
+            if not data:
+                return
+            data += await reader.readexactly(header.size - len(data))
+            rows, cols = header.unpack(data)
+            if rows * cols > self.max_size:
+                return
+            data += await reader.readexactly(rows * cols)
+            try:
+                self.inbox.append(decode_genome(data))
+            except ValueError:
+                return
+
+    def send(self, genomes: list):
+        if genomes and self.peers:
+            data = b''.join(encode_genome(genome) for genome in genomes)
+            for peer in self.peers:
+                asyncio.run_coroutine_threadsafe(self.deliver(peer, data), self.loop)
+
+    async def deliver(self, peer: tuple, data: bytes):
+        try:
+            await asyncio.wait_for(self.connect(peer, data), self.timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError):
+            pass
+
+    async def connect(self, peer: tuple, data: bytes):
+        reader, writer = await asyncio.open_connection(*peer)
+        try:
+            challenge = await reader.readexactly(challenge_size)
+            writer.write(digest(self.authkey, challenge) + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def parse_address(address: str) -> tuple:
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
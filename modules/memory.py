@@ -1,41 +1,98 @@
 import io
 import numpy as np
 import modules.common as c
+import modules.chunked as ch
+
+decode_length = 4
+decode_deltas = {
+    tuple(delta.tolist()): direction
+    for direction, delta in enumerate(c.deltas.values())
+}
+handlers = {inst: info[1] for inst, info in c.instructions.items()}
+
+
+def new_map(fill, dtype) -> np.array:
+    if c.config['chunk_size']:
+        return ch.ChunkedArray(
+            c.config['memory_size'], c.config['chunk_size'], fill, dtype
+        )
+    if fill == 0:
+        return np.zeros(c.config['memory_size'], dtype=dtype)
+    return np.full(c.config['memory_size'], fill, dtype=dtype)
 
 
 class Memory:
     def __init__(
         self,
-        memory_map=np.full(c.config['memory_size'], '.', dtype=str),
-        allocation_map=np.zeros(c.config['memory_size']),
-        position=c.config['memory_size'] // 2,
+        memory_map=None,
+        allocation_map=None,
+        position=None,
+        ownership_map=None,
     ):
-        self.memory_map = memory_map
-        self.allocation_map = allocation_map
-        self.position = position
+        self.memory_map = new_map('.', str) if memory_map is None else memory_map
+        self.allocation_map = (
+            new_map(0, np.float64) if allocation_map is None else allocation_map
+        )
+        self.position = c.config['memory_size'] // 2 if position is None else position
+        self.ownership_map = (
+            new_map(0, np.int32) if ownership_map is None else ownership_map
+        )
+        self.allocated = ch.count_nonzero(self.allocation_map)
+        self.decoded = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['decoded']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'allocated' not in state:
+            self.allocated = ch.count_nonzero(self.allocation_map)
+        if 'ownership_map' not in state:
+            self.ownership_map = None
+        self.decoded = {}
 
-    def allocate(self, address: np.array, size: np.array):
+    def restore_ownership(self, organisms: list):
+        self.ownership_map = new_map(0, np.int32)
+        for organism in organisms:
+            for (address, size), owner in zip(
+                organism.regions(), (organism.slot, -organism.slot)
+            ):
+                self.ownership_map[
+                    address[0] : address[0] + size[0], address[1] : address[1] + size[1]
+                ] = owner
+
+    def allocate(self, address: np.array, size: np.array, owner: int = 0):
+        allocation_region = self.allocation_map[
+            address[0] : address[0] + size[0], address[1] : address[1] + size[1]
+        ]
+        self.allocated += allocation_region.size - np.count_nonzero(allocation_region)
         self.allocation_map[
             address[0] : address[0] + size[0], address[1] : address[1] + size[1]
-        ] = np.ones(
-            self.allocation_map[
-                address[0] : address[0] + size[0], address[1] : address[1] + size[1]
-            ].shape
-        )
+        ] = 1
+        self.ownership_map[
+            address[0] : address[0] + size[0], address[1] : address[1] + size[1]
+        ] = owner
 
     def deallocate(self, address: np.array, size: np.array):
+        allocation_region = self.allocation_map[
+            address[0] : address[0] + size[0], address[1] : address[1] + size[1]
+        ]
+        self.allocated -= np.count_nonzero(allocation_region)
         self.allocation_map[
             address[0] : address[0] + size[0], address[1] : address[1] + size[1]
-        ] = np.zeros(
-            self.allocation_map[
-                address[0] : address[0] + size[0], address[1] : address[1] + size[1]
-            ].shape
-        )
+        ] = 0
+        self.ownership_map[
+            address[0] : address[0] + size[0], address[1] : address[1] + size[1]
+        ] = 0
+
+    def deallocate_regions(self, regions: list):
+        for address, size in regions:
+            self.deallocate(address, size)
 
     def is_time_to_kill(self):
-        ratio = np.count_nonzero(self.allocation_map) / np.count_nonzero(
-            self.allocation_map == 0
-        )
+        ratio = self.allocated / (self.allocation_map.size - self.allocated)
         return ratio > c.config['memory_full_ratio']
 
     def inst(self, address: np.array):
@@ -45,11 +102,62 @@ class Memory:
         for inst, info in c.instructions.items():
             if (info[0] == inst_code).all():
                 self.memory_map[tuple(address)] = inst
+                self.invalidate(np.mod(address, c.config['memory_size']))
+                break
+
+    def decode_key(self, row: int, col: int, direction: int):
+        rows, cols = c.config['memory_size'].tolist()
+        if direction is None or not (0 <= row < rows and 0 <= col < cols):
+            return None
+        return (row * cols + col) * len(decode_deltas) + direction
+
+    def decode(self, address: np.array, delta: np.array) -> tuple:
+        row, col = address.tolist()
+        key = self.decode_key(row, col, decode_deltas.get(tuple(delta.tolist())))
+        if key is not None:
+            operands = self.decoded.get(key)
+            if operands is not None:
+                return handlers[operands[0]], operands
+        operands = ''
+        for offset in range(decode_length):
+            inst_address = address + offset * delta
+            if (inst_address >= c.config['memory_size']).any() or (
+                inst_address < -c.config['memory_size']
+            ).any():
                 break
+            if (inst_address < 0).any():
+                key = None
+            operands += str(self.memory_map[tuple(inst_address)])
+        if not operands:
+            raise IndexError
+        if key is not None:
+            if len(self.decoded) >= c.config['decode_cache_size']:
+                self.decoded.clear()
+            self.decoded[key] = operands
+        return handlers[operands[0]], operands
+
+    def invalidate(self, address: np.array):
+        row, col = address.tolist()
+        for delta, direction in decode_deltas.items():
+            for offset in range(decode_length):
+                key = self.decode_key(
+                    row - offset * delta[0], col - offset * delta[1], direction
+                )
+                if key is not None:
+                    self.decoded.pop(key, None)
+
+    def load_genome(self, genome: np.array, address: np.array, size: np.array):
+        self.memory_map[
+            address[0] : address[0] + size[0], address[1] : address[1] + size[1]
+        ] = genome
+        self.decoded.clear()
 
     def is_allocated(self, address: np.array):
         return bool(self.allocation_map[tuple(address)])
 
+    def owner(self, address: np.array) -> int:
+        return int(self.ownership_map[tuple(address)])
+
     def is_allocated_region(self, address: np.array, size: np.array):
         if (address - size < 0).any():
             return None
@@ -65,10 +173,17 @@ class Memory:
             np.random.randint(0, c.config['memory_size'][0]),
             np.random.randint(0, c.config['memory_size'][1]),
         )
-        self.memory_map[address] = np.random.choice(list(c.instructions.keys()))
+        inst = np.random.choice(list(c.instructions.keys()))
+        if isinstance(self.memory_map, ch.ChunkedArray):
+            self.memory_map.put_cell(*address, inst)
+        else:
+            self.memory_map[address] = inst
+        self.invalidate(np.array(address))
 
     def toogle(self):
-        return MemoryFull(self.memory_map, self.allocation_map, self.position)
+        return MemoryFull(
+            self.memory_map, self.allocation_map, self.position, self.ownership_map
+        )
 
     def update(self, refresh=True):
         pass
@@ -80,11 +195,14 @@ class Memory:
 class MemoryFull(Memory):
     def __init__(
         self,
-        memory_map=np.full(c.config['memory_size'], '.', dtype=str),
-        allocation_map=np.zeros(c.config['memory_size']),
-        position=c.config['memory_size'] // 2,
+        memory_map=None,
+        allocation_map=None,
+        position=None,
+        ownership_map=None,
     ):
-        super(MemoryFull, self).__init__(memory_map, allocation_map, position)
+        super(MemoryFull, self).__init__(
+            memory_map, allocation_map, position, ownership_map
+        )
         screen_display_size = c.screen.get_size()
         self.window = c.screen.derived(
             (0, c.config['info_display_size'][1]),
@@ -97,9 +215,7 @@ class MemoryFull(Memory):
         self.update()
 
     def load_genome(self, genome: np.array, address: np.array, size: np.array):
-        self.memory_map[
-            address[0] : address[0] + size[0], address[1] : address[1] + size[1]
-        ] = genome
+        super(MemoryFull, self).load_genome(genome, address, size)
         self.update()
 
     def clear(self):
@@ -141,8 +257,9 @@ class MemoryFull(Memory):
         self.update(refresh=False)
 
     def toogle(self):
-        return Memory(self.memory_map, self.allocation_map, self.position)
+        return Memory(
+            self.memory_map, self.allocation_map, self.position, self.ownership_map
+        )
 
 
-if c.screen is not None:
-    memory = MemoryFull()
+memory = None
@@ -34,10 +34,12 @@ class Organism:
         reproduction_cycle: Optional[int] = 0,
         parent: Optional[uuid.UUID] = None,
         organism_id: Optional[uuid.UUID] = None,
+        slot: Optional[int] = None,
     ):
         # pylint: disable=invalid-name
-        self.organism_id = uuid.uuid4() if organism_id is None else organism_id
+        self.organism_id = q.queue.new_id() if organism_id is None else organism_id
         self.parent = parent
+        self.slot = q.queue.new_slot() if slot is None else slot
         # pylint: disable=invalid-name
         self.ip = np.array(address) if ip is None and address is not None else ip
         self.delta = delta
@@ -68,7 +70,7 @@ class Organism:
         self.is_selected = is_selected
 
         if address is not None:
-            m.memory.allocate(address, size)
+            m.memory.allocate(address, size, self.slot)
 
         self.reproduction_cycle = reproduction_cycle
         self.children = children
@@ -78,6 +80,12 @@ class Organism:
             q.queue.archive.append(copy(self))
 
         self.mods = {'x': 0, 'y': 1}
+        self.operands = ''
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'operands' not in state:
+            self.operands = ''
 
     def no_operation(self):
         pass
@@ -98,6 +106,8 @@ class Organism:
         return self.ip + offset * self.delta
 
     def inst(self, offset: int = 0) -> str:
+        if offset < len(self.operands):
+            return self.operands[offset]
         return m.memory.inst(self.ip_offset(offset))
 
     def find_template(self):
@@ -168,12 +178,12 @@ class Organism:
                 break
         if is_space_found:
             self.child_size = np.copy(self.regs[self.inst(1)])
-            m.memory.allocate(self.child_start, self.child_size)
+            m.memory.allocate(self.child_start, self.child_size, -self.slot)
 
     def load_inst(self):
-        self.regs[self.inst(2)] = c.instructions[
-            m.memory.inst(self.regs[self.inst(1)])
-        ][0]
+        self.regs[self.inst(2)] = np.copy(
+            c.instructions[m.memory.inst(self.regs[self.inst(1)])][0]
+        )
 
     def write_inst(self):
         if not np.array_equal(self.child_size, np.array([0, 0])):
@@ -198,24 +208,35 @@ class Organism:
     def __lt__(self, other):
         return self.errors < other.errors
 
-    def kill(self):
-        m.memory.deallocate(self.start, self.size)
-        self.size = np.array([0, 0])
+    def regions(self) -> list:
+        regions = [(self.start, self.size)]
         if not np.array_equal(self.child_size, np.array([0, 0])):
-            m.memory.deallocate(self.child_start, self.child_size)
+            regions.append((self.child_start, self.child_size))
+        return regions
+
+    def release(self):
+        q.queue.slots.pop(self.slot, None)
+        self.size = np.array([0, 0])
         self.child_size = np.array([0, 0])
 
+    def kill(self):
+        m.memory.deallocate_regions(self.regions())
+        self.release()
+
     def cycle(self):
+        is_failed = False
         try:
-            getattr(self, c.instructions[self.inst()][1])()
+            handler, self.operands = m.memory.decode(self.ip, self.delta)
+            getattr(self, handler)()
             if (
                 c.config['penalize_parasitism']
-                and not m.memory.is_allocated(self.ip)
+                and abs(m.memory.owner(self.ip)) != self.slot
                 and max(np.abs(self.ip - self.start)) > c.config['penalize_parasitism']
             ):
                 raise ValueError
         except Exception:
             self.errors += 1
+            is_failed = True
         new_ip = self.ip + self.delta
         self.reproduction_cycle += 1
         if (
@@ -224,6 +245,8 @@ class Organism:
         ):
             q.queue.organisms.remove(self)
             self.kill()
+        elif is_failed:
+            q.queue.reaper.push(self)
         if (new_ip < 0).any() or (new_ip - c.config['memory_size'] > 0).any():
             return None
         self.ip = np.copy(new_ip)
@@ -232,6 +255,19 @@ class Organism:
     def update(self):
         pass
 
+    def info(self):
+        info = ''
+        info += '  errors   : {}\n'.format(self.errors)
+        info += '  ip       : {}\n'.format(list(self.ip))
+        info += '  delta    : {}\n'.format(list(self.delta))
+        for reg in self.regs:
+            info += '  r{}       : {}\n'.format(reg, list(self.regs[reg]))
+        for i in range(len(self.stack)):
+            info += '  stack[{}] : {}\n'.format(i, list(self.stack[i]))
+        for i in range(len(self.stack), c.config['stack_length']):
+            info += '  stack[{}] : \n'.format(i)
+        return info
+
     def toogle(self):
         OrganismFull(
             address=None,
@@ -249,6 +285,7 @@ class Organism:
             reproduction_cycle=self.reproduction_cycle,
             parent=self.parent,
             organism_id=self.organism_id,
+            slot=self.slot,
         )
 
 
@@ -270,6 +307,7 @@ class OrganismFull(Organism):
         reproduction_cycle: Optional[int] = 0,
         parent: Optional[uuid.UUID] = None,
         organism_id: Optional[uuid.UUID] = None,
+        slot: Optional[int] = None,
     ):
         super(OrganismFull, self).__init__(
             address=address,
@@ -287,6 +325,7 @@ class OrganismFull(Organism):
             reproduction_cycle=reproduction_cycle,
             parent=parent,
             organism_id=organism_id,
+            slot=slot,
         )
 
         self.update()
@@ -319,19 +358,6 @@ class OrganismFull(Organism):
         self.update_window(self.child_size, self.child_start, child_color)
         self.update_ip()
 
-    def info(self):
-        info = ''
-        info += '  errors   : {}\n'.format(self.errors)
-        info += '  ip       : {}\n'.format(list(self.ip))
-        info += '  delta    : {}\n'.format(list(self.delta))
-        for reg in self.regs:
-            info += '  r{}       : {}\n'.format(reg, list(self.regs[reg]))
-        for i in range(len(self.stack)):
-            info += '  stack[{}] : {}\n'.format(i, list(self.stack[i]))
-        for i in range(len(self.stack), c.config['stack_length']):
-            info += '  stack[{}] : \n'.format(i)
-        return info
-
     def kill(self):
         super(OrganismFull, self).kill()
         self.update()
@@ -354,4 +380,5 @@ class OrganismFull(Organism):
             reproduction_cycle=self.reproduction_cycle,
             parent=self.parent,
             organism_id=self.organism_id,
+            slot=self.slot,
         )
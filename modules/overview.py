@@ -0,0 +1,116 @@
+import os
+import numpy as np
+import modules.common as c
+import modules.chunked as ch
+import modules.memory as m
+import modules.queue as q
+
+inst_classes = np.zeros(128, dtype=np.uint8)
+for _inst, _info in c.instructions.items():
+    inst_classes[ord(_inst)] = _info[0][0]
+
+
+def instruction_classes(memory_map: np.array) -> np.array:
+    return inst_classes[memory_map.view(np.uint32)]
+
+
+def block_area(shape: np.array, step: np.array) -> np.array:
+    return np.outer(
+        np.bincount(np.arange(shape[0]) // step[0]),
+        np.bincount(np.arange(shape[1]) // step[1]),
+    ).astype(np.float64)
+
+
+def block_sum(array, step: np.array, transform=None) -> np.array:
+    if isinstance(array, ch.ChunkedArray):
+        return chunked_block_sum(array, step, transform)
+    return dense_block_sum(array if transform is None else transform(array), step)
+
+
+def chunked_block_sum(array: ch.ChunkedArray, step: np.array, transform=None):
+    fill = np.full((1, 1), array.fill, dtype=array.dtype)
+    fill = float((fill if transform is None else transform(fill))[0, 0])
+    sums = fill * block_area(array.shape, step)
+    for origin, chunk in array.chunk_items():
+        values = chunk if transform is None else transform(chunk)
+        rows = np.arange(origin[0], origin[0] + chunk.shape[0]) // step[0]
+        cols = np.arange(origin[1], origin[1] + chunk.shape[1]) // step[1]
+        row_starts = np.flatnonzero(np.diff(rows, prepend=-1))
+        col_starts = np.flatnonzero(np.diff(cols, prepend=-1))
+        part = np.add.reduceat(
+            np.add.reduceat(values, row_starts, axis=0, dtype=np.float64),
+            col_starts,
+            axis=1,
+        )
+        part -= fill * np.outer(
+            np.diff(row_starts, append=len(rows)), np.diff(col_starts, append=len(cols))
+        )
+        sums[np.ix_(rows[row_starts], cols[col_starts])] += part
+    cells = list(array.cell_items())
+    if cells:
+        rows, cols, values = (np.array(items) for items in zip(*cells))
+        values = values.astype(array.dtype)
+        values = (values if transform is None else transform(values)) - fill
+        np.add.at(sums, (rows // step[0], cols // step[1]), values)
+    return sums
+
+
+def dense_block_sum(array: np.array, step: np.array) -> np.array:
+    full = np.array(array.shape) // step
+    edge = full * step
+    sums = np.zeros(-(-np.array(array.shape) // step))
+    sums[: full[0], : full[1]] = (
+        array[: edge[0], : edge[1]]
+        .reshape(full[0], step[0], full[1], step[1])
+        .sum(axis=(1, 3), dtype=np.float64)
+    )
+    if edge[0] < array.shape[0]:
+        sums[full[0], : full[1]] = (
+            array[edge[0] :, : edge[1]]
+            .reshape(array.shape[0] - edge[0], full[1], step[1])
+            .sum(axis=(0, 2), dtype=np.float64)
+        )
+    if edge[1] < array.shape[1]:
+        sums[: full[0], full[1]] = (
+            array[: edge[0], edge[1] :]
+            .reshape(full[0], step[0], array.shape[1] - edge[1])
+            .sum(axis=(1, 2), dtype=np.float64)
+        )
+    if (edge < array.shape).all():
+        sums[full[0], full[1]] = array[edge[0] :, edge[1] :].sum(dtype=np.float64)
+    return sums
+
+
+class Overview:
+    def __init__(self, directory: str, size: np.array):
+        self.directory = directory
+        self.step = -(-c.config['memory_size'] // np.array(size))
+        self.area = block_area(c.config['memory_size'], self.step)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def render(self) -> np.array:
+        allocation = block_sum(m.memory.allocation_map, self.step) / self.area
+        instructions = (
+            block_sum(m.memory.memory_map, self.step, instruction_classes)
+            / self.area
+            / inst_classes.max()
+        )
+        density = np.zeros(self.area.shape)
+        if q.queue.organisms:
+            ips = np.array([organism.ip for organism in q.queue.organisms])
+            blocks = np.minimum(ips // self.step, np.array(density.shape) - 1)
+            np.add.at(density, tuple(blocks.T), 1)
+            density /= density.max()
+        image = np.stack([allocation, density, instructions], axis=-1)
+        return (image * 255).astype(np.uint8)
+
+    def save(self, cycle: int):
+        image = self.render()
+        filename = os.path.join(
+            self.directory,
+            'frame_{:06d}.ppm'.format(cycle // c.config['overview_rate']),
+        )
+        with open(filename, 'wb') as f:
+            f.write('P6\n{} {}\n255\n'.format(image.shape[1], image.shape[0]).encode())
+            f.write(image.tobytes())
@@ -1,15 +1,46 @@
+import random
+import uuid
 from copy import copy
 import modules.common as c
+import modules.memory as m
+import modules.reaper as r
 
 
 class Queue:
-    def __init__(self):
+    def __init__(self, seed=None):
         self.organisms = []
         self.archive = []
         self.index = None
+        self.slots = {}
+        self.last_slot = 0
+        self.reaper = r.Reaper()
+        self.ids = random.Random(seed)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'ids' not in state:
+            self.ids = random.Random()
+        if 'slots' not in state:
+            self.slots = {}
+            self.last_slot = 0
+            for organism in self.organisms:
+                organism.slot = self.new_slot()
+                self.slots[organism.slot] = organism
+        if 'reaper' not in state:
+            self.reaper = r.Reaper()
+            self.reaper.rebuild(self.slots)
+
+    def new_slot(self) -> int:
+        self.last_slot += 1
+        return self.last_slot
+
+    def new_id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.ids.getrandbits(128), version=4)
 
     def add_organism(self, organism):
         self.organisms.append(organism)
+        self.slots[organism.slot] = organism
+        self.reaper.push(organism)
         if self.index is None:
             self.index = 0
             self.organisms[self.index].is_selected = True
@@ -38,6 +69,20 @@ class Queue:
             self.organisms[self.index].is_selected = True
             self.organisms[self.index].update()
 
+    def organism_at(self, address):
+        return self.slots.get(abs(m.memory.owner(address)))
+
+    def select_at(self, address):
+        organism = self.organism_at(address)
+        if organism is None or organism not in self.organisms:
+            return
+        if self.index is not None and self.index < len(self.organisms):
+            self.organisms[self.index].is_selected = False
+            self.organisms[self.index].update()
+        self.index = self.organisms.index(organism)
+        self.organisms[self.index].is_selected = True
+        self.organisms[self.index].update()
+
     def cycle_all(self):
         for organism in copy(self.organisms):
             organism.cycle()
@@ -45,10 +90,22 @@ class Queue:
     def kill_organisms(self):
         sorted_organisms = sorted(self.organisms, reverse=True)
         ratio = int(len(self.organisms) * c.config['kill_organisms_ratio'])
-        for organism in sorted_organisms[:ratio]:
-            organism.kill()
+        victims = sorted_organisms[:ratio]
+        m.memory.deallocate_regions(
+            [region for organism in victims for region in organism.regions()]
+        )
+        for organism in victims:
+            organism.release()
         self.organisms = sorted_organisms[ratio:]
 
+    def reap(self) -> int:
+        count = 0
+        for organism in self.reaper.victims(self.slots):
+            self.organisms.remove(organism)
+            organism.kill()
+            count += 1
+        return count
+
     def update_all(self):
         for organism in copy(self.organisms):
             organism.update()
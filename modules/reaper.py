@@ -0,0 +1,36 @@
+import heapq
+import modules.common as c
+import modules.memory as m
+
+
+class Reaper:
+    def __init__(self):
+        self.heap = []
+        self.tick = 0
+
+    def key(self, organism) -> tuple:
+        return -organism.errors, self.tick - organism.reproduction_cycle
+
+    def push(self, organism):
+        if c.config['incremental_reaper']:
+            heapq.heappush(self.heap, (*self.key(organism), organism.slot))
+
+    def victims(self, slots: dict):
+        if len(self.heap) < len(slots):
+            self.rebuild(slots)
+        while self.heap and m.memory.is_time_to_kill():
+            *key, slot = heapq.heappop(self.heap)
+            organism = slots.get(slot)
+            if organism is None:
+                continue
+            if tuple(key) != self.key(organism):
+                self.push(organism)
+                continue
+            yield organism
+        self.tick += 1
+        if len(self.heap) > 4 * len(slots) + 64:
+            self.rebuild(slots)
+
+    def rebuild(self, slots: dict):
+        self.heap = [(*self.key(organism), slot) for slot, organism in slots.items()]
+        heapq.heapify(self.heap)
@@ -0,0 +1,57 @@
+import glob
+import os
+import re
+
+
+class Recorder:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.events_filename = os.path.join(directory, 'events.log')
+        self.events = {}
+        if os.path.exists(self.events_filename):
+            with open(self.events_filename) as events_file:
+                for line in events_file:
+                    cycle, command = line.split()
+                    self.events.setdefault(int(cycle), []).append(command)
+
+    def record(self, cycle: int, command: str):
+        self.events.setdefault(cycle, []).append(command)
+        with open(self.events_filename, 'a') as events_file:
+            events_file.write('{} {}\n'.format(cycle, command))
+
+    def events_at(self, cycle: int) -> list:
+        return self.events.get(cycle, [])
+
+    def checkpoint_filename(self, cycle: int) -> str:
+        return os.path.join(self.directory, 'cycle_{}.checkpoint'.format(cycle))
+
+    def checkpoints(self) -> dict:
+        checkpoints = {}
+        for filename in glob.glob(os.path.join(self.directory, '*.checkpoint')):
+            match = re.search(r'cycle_(\d+)\.checkpoint$', filename)
+            if match:
+                checkpoints[int(match.group(1))] = filename
+        return checkpoints
+
+    def nearest_checkpoint(self, cycle: int):
+        checkpoints = self.checkpoints()
+        earlier = [checkpoint for checkpoint in checkpoints if checkpoint <= cycle]
+        if not earlier:
+            return None
+        return checkpoints[max(earlier)]
+
+    def rewind(self, cycle: int):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        self.events = {
+            event_cycle: commands
+            for event_cycle, commands in self.events.items()
+            if event_cycle < cycle
+        }
+        with open(self.events_filename, 'w') as events_file:
+            for event_cycle in sorted(self.events):
+                for command in self.events[event_cycle]:
+                    events_file.write('{} {}\n'.format(event_cycle, command))
+        for checkpoint, filename in self.checkpoints().items():
+            if checkpoint > cycle:
+                os.remove(filename)
@@ -0,0 +1,32 @@
+import os
+import shutil
+import numpy as np
+import pytest
+import modules.common as c
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.chdir(root)
+    c.load_config()
+    c.config['memory_size'] = np.array([6, 7])
+    c.config['chunk_size'] = 0
+    yield c.config
+    c.config.clear()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    with open(os.path.join(root, 'config.toml')) as config_file:
+        lines = config_file.read().splitlines()
+    lines = [
+        'memory_size = [1000, 1000]' if line.startswith('memory_size') else line
+        for line in lines
+    ]
+    (tmp_path / 'config.toml').write_text('\n'.join(lines))
+    shutil.copy(os.path.join(root, 'initial.gen'), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    c.config.clear()
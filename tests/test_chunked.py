@@ -0,0 +1,53 @@
+import numpy as np
+import modules.chunked as ch
+import modules.common as c
+import modules.memory as m
+import modules.overview as v
+
+
+def test_chunked_array_matches_dense():
+    random = np.random.RandomState(0)
+    shape, alphabet = (23, 19), list(c.instructions)
+    dense = np.full(shape, '.', dtype=str)
+    chunked = ch.ChunkedArray(shape, 8, '.', str)
+    for _ in range(3000):
+        row, col = random.randint(shape[0]), random.randint(shape[1])
+        value = random.choice(alphabet + ['.'] * 5)
+        operation = random.randint(4)
+        if operation == 0:
+            chunked.put_cell(row, col, value)
+            dense[row, col] = value
+        elif operation == 1 and random.randint(20) == 0:
+            chunked[row, col] = value
+            dense[row, col] = value
+        elif operation == 2 and random.randint(20) == 0:
+            size = random.randint(1, 6, 2)
+            chunked[row : row + size[0], col : col + size[1]] = value
+            dense[row : row + size[0], col : col + size[1]] = value
+        else:
+            assert chunked[row, col] == dense[row, col]
+            assert (chunked[row, :] == dense[row, :]).all()
+            assert (chunked[:, col] == dense[:, col]).all()
+            assert (chunked[row : row + 5, col:] == dense[row : row + 5, col:]).all()
+    assert (chunked[:, :] == dense).all()
+    assert chunked.count_nonzero() == np.count_nonzero(dense)
+    rows, cols = np.divmod(np.arange(dense.size), shape[1])
+    assert (chunked.take(rows, cols) == dense.ravel()).all()
+    step = np.array([5, 4])
+    assert np.allclose(
+        v.block_sum(chunked, step, v.instruction_classes),
+        v.dense_block_sum(v.instruction_classes(dense), step),
+    )
+
+
+def test_mutations_do_not_create_tiles(config):
+    config['memory_size'] = np.array([128, 128])
+    dense = m.Memory()
+    config['chunk_size'] = 64
+    chunked = m.Memory()
+    for memory in (dense, chunked):
+        np.random.seed(0)
+        for _ in range(100):
+            memory.cycle()
+    assert not chunked.memory_map.chunks
+    assert (chunked.memory_map[:, :] == dense.memory_map).all()
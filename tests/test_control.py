@@ -0,0 +1,21 @@
+import socket
+import pytest
+import fungera
+import modules.common as c
+
+
+def test_busy_control_port_fails(workdir):
+    with socket.create_server(('127.0.0.1', 0)) as busy:
+        port = busy.getsockname()[1]
+        with pytest.raises(SystemExit):
+            fungera.Fungera(
+                c.parser.parse_args(['--headless', '--control-port', str(port)])
+            )
+
+
+def test_control_status(workdir):
+    simulation = fungera.Fungera(c.parser.parse_args(['--headless']))
+    simulation.timer.cancel()
+    status = simulation.command('status')
+    assert status['cycle'] == 0 and status['organisms'] == 1
+    assert 'error' in simulation.command('unknown')
@@ -0,0 +1,37 @@
+import numpy as np
+import fungera
+import modules.common as c
+import modules.island as i
+import modules.memory as m
+import modules.queue as q
+
+
+def test_loopback_migration(workdir):
+    island, peer = i.LoopbackTransport(), i.LoopbackTransport()
+    island.connect(peer)
+    peer.connect(island)
+    simulation = fungera.Fungera(c.parser.parse_args(['--headless']), island=island)
+    simulation.timer.cancel()
+    with open('initial.gen') as genome_file:
+        genome = np.array([list(line.strip()) for line in genome_file])
+    peer.send(
+        [genome, np.full((600, 3), '.'), np.array([['Z']]), np.array([[1, 2]]), 'junk']
+    )
+    population = len(q.queue.organisms)
+    simulation.migrate()
+    assert len(peer.receive()) == min(c.config['migration_size'], population)
+    assert len(q.queue.organisms) == population + 1
+    migrant = q.queue.organisms[-1]
+    assert (
+        m.memory.memory_map[
+            migrant.start[0] : migrant.start[0] + migrant.size[0],
+            migrant.start[1] : migrant.start[1] + migrant.size[1],
+        ]
+        == genome
+    ).all()
+    assert m.memory.is_allocated_region(migrant.start, migrant.size)
+
+
+def test_genome_encoding_round_trip():
+    genome = np.array([list('&ab.'), list('@$WL')])
+    assert (i.decode_genome(i.encode_genome(genome)) == genome).all()
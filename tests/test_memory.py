@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+import modules.common as c
+import modules.memory as m
+
+
+def read_window(memory, address, delta):
+    operands = ''
+    for offset in range(m.decode_length):
+        try:
+            operands += str(memory.memory_map[tuple(address + offset * delta)])
+        except IndexError:
+            break
+    if not operands:
+        raise IndexError
+    return c.instructions[operands[0]][1], operands
+
+
+def decode_or_error(memory, address, delta):
+    try:
+        return memory.decode(address, delta)
+    except IndexError:
+        return IndexError
+
+
+def read_or_error(memory, address, delta):
+    try:
+        return read_window(memory, address, delta)
+    except IndexError:
+        return IndexError
+
+
+@pytest.fixture
+def memory(config):
+    memory = m.Memory()
+    random = np.random.RandomState(0)
+    memory.memory_map[:, :] = random.choice(
+        list(c.instructions), tuple(config['memory_size'])
+    )
+    return memory
+
+
+def test_decode_past_right_edge_raises(memory, config):
+    rows, cols = config['memory_size']
+    memory.decode(np.array([1, 0]), c.deltas['right'])
+    with pytest.raises(IndexError):
+        memory.decode(np.array([0, cols]), c.deltas['right'])
+    with pytest.raises(IndexError):
+        memory.decode(np.array([rows, 0]), c.deltas['down'])
+
+
+def test_decode_wraps_negative_addresses(memory, config):
+    rows, cols = config['memory_size']
+    for address, delta in [
+        ([-1, 2], c.deltas['down']),
+        ([1, -1], c.deltas['right']),
+        ([1, 1], c.deltas['left']),
+        ([0, 3], c.deltas['up']),
+    ]:
+        address = np.array(address)
+        assert memory.decode(address, delta) == read_window(memory, address, delta)
+    with pytest.raises(IndexError):
+        memory.decode(np.array([-rows - 1, 0]), c.deltas['down'])
+
+
+def test_decode_matches_direct_reads(memory, config):
+    rows, cols = config['memory_size']
+    random = np.random.RandomState(1)
+    deltas = list(c.deltas.values())
+    for _ in range(5000):
+        address = np.array(
+            [random.randint(-rows - 1, rows + 2), random.randint(-cols - 1, cols + 2)]
+        )
+        delta = deltas[random.randint(len(deltas))]
+        if random.randint(10) == 0:
+            memory.write_inst(
+                np.array([random.randint(rows), random.randint(cols)]),
+                c.instructions[random.choice(list(c.instructions))][0],
+            )
+        assert decode_or_error(memory, address, delta) == read_or_error(
+            memory, address, delta
+        )
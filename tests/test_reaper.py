@@ -0,0 +1,20 @@
+import fungera
+import modules.common as c
+import modules.queue as q
+
+
+def test_reaper_rebuilds_missing_entries(workdir):
+    config_file = workdir / 'config.toml'
+    config_file.write_text(
+        config_file.read_text().replace(
+            'incremental_reaper = true', 'incremental_reaper = false'
+        )
+    )
+    simulation = fungera.Fungera(c.parser.parse_args(['--headless']))
+    simulation.timer.cancel()
+    assert q.queue.organisms and not q.queue.reaper.heap
+    c.config['incremental_reaper'] = True
+    c.config['memory_full_ratio'] = 0
+    simulation.make_cycle()
+    assert simulation.reaped == 1
+    assert not q.queue.organisms
@@ -0,0 +1,36 @@
+import os
+import pytest
+import fungera
+import modules.common as c
+import modules.queue as q
+
+
+def test_seek_without_checkpoint_fails(workdir):
+    with pytest.raises(SystemExit):
+        fungera.Fungera(c.parser.parse_args(['--headless', '--seek', '10']))
+    assert not os.path.exists('checkpoints')
+
+
+def test_seek_replays_organism_ids(workdir):
+    line_args = ['--headless', '--name', 'replay']
+    simulation = fungera.Fungera(c.parser.parse_args(line_args + ['--record']))
+    simulation.timer.cancel()
+    c.config['checkpoint_rate'] = 5000
+    while simulation.cycle < 20000:
+        q.queue.cycle_all()
+        simulation.make_cycle()
+    assert any(o.parent is not None for o in q.queue.organisms)
+    lineage = [(o.organism_id, o.parent, tuple(o.ip)) for o in q.queue.organisms]
+    seeked = fungera.Fungera(c.parser.parse_args(line_args + ['--seek', '20000']))
+    seeked.timer.cancel()
+    assert [(o.organism_id, o.parent, tuple(o.ip)) for o in q.queue.organisms] == (
+        lineage
+    )
+
+
+def test_record_keeps_existing_recording(workdir):
+    line_args = ['--headless', '--name', 'kept', '--record']
+    fungera.Fungera(c.parser.parse_args(line_args)).timer.cancel()
+    with pytest.raises(SystemExit):
+        fungera.Fungera(c.parser.parse_args(line_args))
+    assert os.listdir(os.path.join('checkpoints', 'kept'))